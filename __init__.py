@@ -1,4 +1,4 @@
-from .nui_scalar_data import NuiScalarDataPlugin
+from .nui_scalar_data_plugin import NuiScalarDataPlugin
 
 
 def classFactory(iface):
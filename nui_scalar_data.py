@@ -1,11 +1,15 @@
+import collections
+import functools
 import importlib
-import os
+import json
+import logging
+import operator
+import struct
 import sys
 import threading
 import yaml
 
 import PyQt5.QtWidgets as QtWidgets
-import PyQt5.QtGui as QtGui
 import PyQt5.QtCore as QtCore
 
 import qgis.core
@@ -26,26 +30,30 @@ from .nui_scalar_data_widgets import (
     ConfigureTimeLimitsWidget,
     ConfigureTimeSeriesWidget,
     QHLine,
-    QVLine,
 )
 from .nui_scalar_data_plotters import (
+    MAX_PENDING_SAMPLES,
     MapLayerPlotter,
     TimeSeriesPlotter,
+    make_field_unpacker,
 )
 
-import inspect
+log = logging.getLogger(__name__)
 
-cmd_folder = os.path.split(inspect.getfile(inspect.currentframe()))[0]
+# Samples handed from the LCM thread to the GUI thread are capped too, so a
+# stalled GUI thread can't grow memory without bound. Room for a full
+# SampleQueue's worth from each of several busy fields.
+MAX_INCOMING_SAMPLES = 10 * MAX_PENDING_SAMPLES
 
 
 class NuiScalarDataMainWindow(QtWidgets.QMainWindow):
-    # If I understand correctly, any slots decorated with @pyqtSlot will be
-    # called in the thread that created the connection, NOT the thread that
-    # emitted the signal. So, use that to get data from the LCM thread into
-    # the main Widget thread.
-
-    # Otherwise, trying to add features to the layer will give a warning since parent object is in another thread.
-    new_data = QtCore.pyqtSignal(str, float, float)  # layer key, timestamp, value
+    # Data has to get from the LCM thread into the main Widget thread;
+    # otherwise, trying to add features to the layer will give a warning
+    # since parent object is in another thread.
+    # Rather than emitting a queued signal per sample, the LCM thread appends
+    # to a deque (thread-safe for a single producer/consumer), and only
+    # signals when a drain isn't already scheduled.
+    incoming_ready = QtCore.pyqtSignal()
 
     def __init__(self, iface, parent=None):
         super(NuiScalarDataMainWindow, self).__init__(parent)
@@ -88,8 +96,15 @@ class NuiScalarDataMainWindow(QtWidgets.QMainWindow):
                 "nui_scalar_data", "subscriptions"
             )
             if success:
-                self.loaded_config = yaml.safe_load(config_str)
-                print(f"Loaded config! {self.loaded_config}")
+                # The config is saved as JSON, which is much faster to parse.
+                # Projects saved by older versions of the plugin have YAML.
+                try:
+                    self.loaded_config = json.loads(config_str)
+                except ValueError:
+                    # libyaml's loader, if PyYAML was built with it.
+                    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+                    self.loaded_config = yaml.load(config_str, Loader=loader)
+                log.debug(f"Loaded config! {self.loaded_config}")
             else:
                 self.loaded_config = {}
         except Exception as ex:
@@ -101,26 +116,43 @@ class NuiScalarDataMainWindow(QtWidgets.QMainWindow):
         #   but this works for now.
         self.msg_modules = {}
 
-        # TODO: We don't actually need this dict; information is available in self.config
-        # layer_name -> sample rate
-        self.sample_rates = {}
         # layer_name -> timestamp of most recently-added feature (used for decimation)
+        # Only touched from the LCM thread (and popped in remove_field).
         self.last_updated = {}
 
         self.subscribers = {}
 
-        self.new_data.connect(self.update_data)
-        # For now, the parent class is handling throttling. Might make sense
-        # to push that down into the child classes when I finish refactoring.
-        # self.new_data.connect(self.map_layer_manager.update_data)
-        # self.new_data.connect(self.scalar_plotter.update_data)
+        # (layer key, timestamp, value), appended by the LCM thread.
+        self.incoming = collections.deque(maxlen=MAX_INCOMING_SAMPLES)
+        # Only written by the LCM thread; process_incoming reports the
+        # difference since it last checked.
+        self.num_incoming_dropped = 0
+        self.num_incoming_dropped_reported = 0
+        # Set by the LCM thread when it signals incoming_ready; cleared by
+        # process_incoming before draining, so no sample gets stranded.
+        self.incoming_scheduled = False
+        # Samples arriving within this window get drained together.
+        self.incoming_timer = QtCore.QTimer()
+        self.incoming_timer.setSingleShot(True)
+        self.incoming_timer.setInterval(50)  # ms
+        self.incoming_timer.timeout.connect(self.process_incoming)
+        self.incoming_ready.connect(
+            self.incoming_timer.start, QtCore.Qt.QueuedConnection
+        )
 
         self.update_timer = QtCore.QTimer()
         self.update_timer.timeout.connect(self.time_series_plotter.maybe_refresh)
         self.update_timer.setSingleShot(False)
         self.update_timer.start(500)  # ms
 
+        # Adding/removing fields only marks the config as dirty; it gets
+        # serialized once things settle (e.g. after loading all subscriptions)
+        self.save_config_timer = QtCore.QTimer()
+        self.save_config_timer.setSingleShot(True)
+        self.save_config_timer.timeout.connect(self.save_config)
+
         self.shutdown = False
+        self.lcm_thread = None  # Started by run()
 
         self.update_subscriptions()  # Activate any subscriptions from the config
 
@@ -134,6 +166,10 @@ class NuiScalarDataMainWindow(QtWidgets.QMainWindow):
         self.vbox.addWidget(self.time_limits_widget)
         self.vbox.addWidget(QHLine())
         self.vbox.addWidget(self.time_series_widget)
+        self.vbox.addWidget(QHLine())
+        self.pause_checkbox = QtWidgets.QCheckBox("Pause updates")
+        self.pause_checkbox.toggled.connect(self.pause_updates)
+        self.vbox.addWidget(self.pause_checkbox)
         self.vbox.addStretch(1.0)
 
         self.hbox = QtWidgets.QHBoxLayout()
@@ -146,17 +182,43 @@ class NuiScalarDataMainWindow(QtWidgets.QMainWindow):
         self.setCentralWidget(self.my_widget)
         self.setWindowTitle("NUI Scalar Data")
 
-    @QtCore.pyqtSlot(str, float, float)
+    @QtCore.pyqtSlot(bool)
+    def pause_updates(self, paused):
+        """
+        Stop redrawing the map layers and time series plot (e.g. while
+        navigating the map). Incoming data is still collected, and shows up
+        when updates resume.
+        """
+        if paused:
+            self.map_layer_plotter.pause()
+            self.time_series_plotter.pause()
+        else:
+            self.map_layer_plotter.resume()
+            self.time_series_plotter.resume()
+
+    @QtCore.pyqtSlot()
+    def process_incoming(self):
+        self.incoming_scheduled = False
+        incoming = self.incoming
+        # Only take what's there now; the LCM thread may still be appending.
+        for _ in range(len(incoming)):
+            self.update_data(*incoming.popleft())
+        num_dropped = self.num_incoming_dropped
+        if num_dropped > self.num_incoming_dropped_reported:
+            errmsg = (
+                f"Dropped {num_dropped - self.num_incoming_dropped_reported}"
+                " incoming samples; GUI thread fell behind"
+            )
+            log.warning(errmsg)
+            QgsMessageLog.logMessage(errmsg)
+            self.num_incoming_dropped_reported = num_dropped
+
     def update_data(self, key, tt, val):
-        """ """
-        # Decimate the features that we actually show, since QGIS is displeased by
-        # layers with tens or hundreds of thousands of features.
-        # QUESTION: better way to get this timestamp? it's somewhere in the layer ...
-        dt = tt - self.last_updated[key]
-        period = 1.0 / self.sample_rates[key]
-        if dt < period:
-            return
-        self.last_updated[key] = tt
+        """
+        Receives samples that have already been decimated by handle_data.
+        """
+        if key not in self.config:
+            return  # Queued before the field was removed
 
         # NOTE(lindzey): I expect this to be replaced by a singal/slot
         #   when I finish the refactoring and also pull out the time series plots.
@@ -181,10 +243,9 @@ class NuiScalarDataMainWindow(QtWidgets.QMainWindow):
 
     @QtCore.pyqtSlot(str)
     def remove_field(self, key):
-        self.sample_rates.pop(key)
-        self.last_updated.pop(key)
+        self.last_updated.pop(key, None)
         self.config.pop(key)
-        self.save_config()
+        self.save_config_timer.start(500)  # ms
         self.lc.unsubscribe(self.subscribers[key])
         self.subscribers.pop(key)
 
@@ -196,10 +257,10 @@ class NuiScalarDataMainWindow(QtWidgets.QMainWindow):
         Subscribe to specified data and plot in both map and profile view.
         """
         key = f"{channel}/{msg_field}"
-        print(f"add_field for key={key}")
+        log.debug(f"add_field for key={key}")
         if key in self.config:
             errmsg = f"Duplicate field '{key}'"
-            print(errmsg)
+            log.warning(errmsg)
             self.iface.messageBar().pushMessage(errmsg, level=Qgis.Warning)
             QgsMessageLog.logMessage(errmsg)
             return
@@ -211,9 +272,8 @@ class NuiScalarDataMainWindow(QtWidgets.QMainWindow):
             layer_name,
             create_layer,
         ]
-        self.save_config()
+        self.save_config_timer.start(500)  # ms
 
-        self.sample_rates[key] = sample_rate
         self.last_updated[key] = 0.0
 
         self.time_series_plotter.add_field(key, layer_name)
@@ -228,110 +288,108 @@ class NuiScalarDataMainWindow(QtWidgets.QMainWindow):
         if msg_pkg not in self.msg_modules:
             self.msg_modules[msg_pkg] = importlib.import_module(msg_pkg)
         msg_type = getattr(self.msg_modules[msg_pkg], msg_class)
+        # A non-positive rate means "don't decimate" (beyond dropping
+        # samples that aren't newer than the last one; see update_plot).
+        period = 1.0 / sample_rate if sample_rate > 0 else 1.0e-6
+        # partial + attrgetter avoid an extra Python frame and the getattr
+        # name lookup for every message received.
         self.subscribers[key] = self.lc.subscribe(
             channel,
-            lambda channel, data, msg_type=msg_type, msg_field=msg_field: self.handle_data(
-                msg_type, msg_field, channel, data
+            functools.partial(
+                self.handle_data,
+                key,
+                msg_type.decode,
+                operator.attrgetter(msg_field),
+                make_field_unpacker(msg_type, ["utime"]),
+                period,
             ),
         )
 
-    def handle_data(self, msg_type, msg_field, channel, data):
-        key = f"{channel}/{msg_field}"
+    def handle_data(self, key, decode, get_value, peek_utime, period, channel, data):
         try:
-            msg = msg_type.decode(data)
+            # Decimate the features that we actually show, since QGIS is displeased by
+            # layers with tens or hundreds of thousands of features.
+            # Doing it here, rather than in the GUI thread, means dropped
+            # samples never get queued across threads. When possible, check
+            # the timestamp before paying for the full decode.
+            if peek_utime is not None:
+                (utime,) = peek_utime(data)
+                if utime / 1.0e6 - self.last_updated.get(key, 0.0) < period:
+                    return
+            msg = decode(data)
             tt = msg.utime / 1.0e6
-            vv = getattr(msg, msg_field)
-            self.new_data.emit(key, tt, vv)
-        except ValueError as ex:
-            errmsg = f"Could not decode message of type {msg_type} from channel {channel}. Exception = {ex}"
-            print(errmsg)
+            if tt - self.last_updated.get(key, 0.0) < period:
+                return
+            self.last_updated[key] = tt
+            # The plotters batch samples into float arrays, so anything that
+            # isn't a scalar number has to be caught here rather than there.
+            try:
+                vv = float(get_value(msg))
+            except (AttributeError, TypeError, ValueError) as ex:
+                errmsg = f"Couldn't parse data from message: {ex}"
+                log.warning(errmsg)
+                QgsMessageLog.logMessage(errmsg)
+                return
+            if len(self.incoming) == self.incoming.maxlen:
+                self.num_incoming_dropped += 1
+            self.incoming.append((key, tt, vv))
+            if not self.incoming_scheduled:
+                self.incoming_scheduled = True
+                self.incoming_ready.emit()
+        except (ValueError, struct.error) as ex:
+            errmsg = f"Could not decode message from channel {channel} using {decode.__qualname__}. Exception = {ex}"
+            log.warning(errmsg)
             QgsMessageLog.logMessage(errmsg)
         except AttributeError as ex:
             errmsg = f"Couldn't parse data from message: {ex}"
-            print(errmsg)
+            log.warning(errmsg)
             QgsMessageLog.logMessage(errmsg)
 
     def spin_lcm(self):
-        print("spin_lcm")
+        log.debug("spin_lcm")
         QgsMessageLog.logMessage("spin_lcm")
+        # LCM I/O stays on this background thread; results reach the GUI
+        # thread via self.incoming (and queued signals). Use a timeout rather
+        # than a blocking handle() so the loop notices shutdown even if the
+        # network is quiet.
         while not self.shutdown:
-            self.lc.handle()
-        print("stopping spin_lcm")
+            self.lc.handle_timeout(100)  # ms
+        log.debug("stopping spin_lcm")
 
     def run(self):
-        lcm_thread = threading.Thread(target=self.spin_lcm)
-        lcm_thread.start()
+        self.lcm_thread = threading.Thread(target=self.spin_lcm, daemon=True)
+        self.lcm_thread.start()
         # This function MUST return, or QGIS will block
 
     def closeEvent(self, event):
-        print("handle_close_event")
+        log.debug("handle_close_event")
         self.shutdown = True
+        # spin_lcm checks the flag at least every 100 ms; wait for it to exit
+        # so we don't leave a thread behind (e.g. on plugin reload), and so
+        # unsubscribing below doesn't race with handle_timeout.
+        if self.lcm_thread is not None:
+            self.lcm_thread.join(timeout=1.0)
+            if self.lcm_thread.is_alive():
+                log.warning("LCM thread did not exit")
+            self.lcm_thread = None
         self.update_timer.stop()
+        self.incoming_timer.stop()
         for key, sub in self.subscribers.items():
-            print(f"Unsubscribing from {key}")
+            log.debug(f"Unsubscribing from {key}")
             try:
                 self.lc.unsubscribe(sub)
             except Exception as ex:
-                print(ex)
+                log.warning(ex)
 
         self.map_layer_plotter.closeEvent(event)
         self.time_series_plotter.closeEvent(event)
 
+        self.save_config_timer.stop()
         self.save_config()
         event.accept()
 
+    @QtCore.pyqtSlot()
     def save_config(self):
-        print(f"Saving updated config! {yaml.safe_dump(self.config)}")
-        QgsProject.instance().writeEntry(
-            "nui_scalar_data", "subscriptions", yaml.safe_dump(self.config)
-        )
-
-
-# Needs to be a QObject to use signals/slots
-class NuiScalarDataPlugin(QtCore.QObject):
-    def __init__(self, iface):
-        super(NuiScalarDataPlugin, self).__init__()
-        self.iface = iface
-
-    def initGui(self):
-        """
-        Required method; called when plugin loaded.
-        """
-        print("initGui")
-        icon = os.path.join(os.path.join(cmd_folder, "nui.png"))
-        self.action = QtWidgets.QAction(
-            QtGui.QIcon(icon), "Display scalar data from NUI", self.iface.mainWindow()
-        )
-        self.action.triggered.connect(self.run)
-        self.iface.addPluginToMenu("&NUI Scalar Data", self.action)
-        self.iface.addToolBarIcon(self.action)
-
-    def unload(self):
-        """
-        Required method; called when plugin unloaded.
-        """
-        print("unload")
-        self.iface.removeToolBarIcon(self.action)
-        self.iface.removePluginMenu("&NUI Scalar Data", self.action)
-        del self.action
-
-    def run(self):
-        print("run")
-
-        # I actually prefer this, because multiple windows are easier to deal
-        # with than a dockable window that won't go to the background.
-        # self.mainwindow = NuiScalarDataMainWindow(self.iface)
-        # self.mainwindow.show()
-        # self.mainwindow.run()
-
-        # However, it's possible to wrap the MainWindow in a DockWidget...
-        mw = NuiScalarDataMainWindow(self.iface)
-        self.dw = QtWidgets.QDockWidget("NUI Scalar Data")
-        # Need to unsubscribe from LCM callbacks when the dock widget is closed.
-        self.dw.closeEvent = lambda event: mw.closeEvent(event)
-        self.dw.setWidget(mw)
-        self.iface.addDockWidget(QtCore.Qt.BottomDockWidgetArea, self.dw)
-        mw.run()
-
-        print("Done with dockwidget")
-        # This function MUST return, or QGIS will block
+        config_str = json.dumps(self.config)
+        log.debug(f"Saving updated config! {config_str}")
+        QgsProject.instance().writeEntry("nui_scalar_data", "subscriptions", config_str)
@@ -1,12 +1,16 @@
+import collections
 import datetime
+import functools
+import logging
 import math
 import numpy as np
+import operator
+import struct
 import sys
-import threading
 
 from matplotlib.figure import Figure
 from matplotlib.backend_bases import MouseButton
-import matplotlib.pyplot as plt
+import matplotlib
 from matplotlib.ticker import FuncFormatter, ScalarFormatter
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 
@@ -29,47 +33,280 @@ sys.path.append("/opt/dsl/lib/python3.11/site-packages")
 from comms import statexy_t
 from ini import dive_t  # for origin_latitude, origin_longitude
 
+log = logging.getLogger(__name__)
+
 
 # I tried using the Proj4 ortho projection, but that didn't seem to match expected
 # So, since our layers will all be in EPSG:4326, I'll use code ported from
 # dslpp/mfiles/utils/conversions/xy2ll.m
 def ll2xy(lat, lon, lat_0, lon_0):
-    if lon > 180:
-        lon = lon - 360
-    if lon < -180:
-        lon = lon + 360
+    """
+    Works on either scalars or np.ndarrays.
+    """
+    lon = np.where(lon > 180, lon - 360, lon)
+    lon = np.where(lon < -180, lon + 360, lon)
     xx = (lon - lon_0) * mdeglon(lat_0)
     yy = (lat - lat_0) * mdeglat(lat_0)
     return (xx, yy)
 
 
 def xy2ll(xx, yy, lat_0, lon_0):
+    """
+    Works on either scalars or np.ndarrays.
+    """
     lon = xx / mdeglon(lat_0) + lon_0
     lat = yy / mdeglat(lat_0) + lat_0
     return lat, lon
 
 
 def mdeglat(lat_deg):
-    latrad = math.radians(lat_deg)
+    latrad = np.radians(lat_deg)
     dy = (
         111132.09
-        - 566.05 * math.cos(2.0 * latrad)
-        + 1.20 * math.cos(4.0 * latrad)
-        - 0.002 * math.cos(6.0 * latrad)
+        - 566.05 * np.cos(2.0 * latrad)
+        + 1.20 * np.cos(4.0 * latrad)
+        - 0.002 * np.cos(6.0 * latrad)
     )
     return dy
 
 
 def mdeglon(lat_deg):
-    latrad = math.radians(lat_deg)
+    latrad = np.radians(lat_deg)
     dx = (
-        111415.13 * math.cos(latrad)
-        - 94.55 * math.cos(3.0 * latrad)
-        + 0.12 * math.cos(5.0 * latrad)
+        111415.13 * np.cos(latrad)
+        - 94.55 * np.cos(3.0 * latrad)
+        + 0.12 * np.cos(5.0 * latrad)
     )
     return dx
 
 
+# struct codes for the LCM primitive types; LCM encodes a message as an
+# 8-byte fingerprint followed by its fields in declaration order, big-endian.
+LCM_STRUCT_CODES = {
+    "int8_t": "b",
+    "int16_t": "h",
+    "int32_t": "i",
+    "int64_t": "q",
+    "float": "f",
+    "double": "d",
+    "boolean": "b",
+    "byte": "B",
+}
+
+
+def make_field_unpacker(msg_type, field_names):
+    """
+    Return a function that reads the named fields straight from an encoded
+    msg_type, as a tuple in the order given, without decoding the rest of
+    the message. Like decode, it raises ValueError on a fingerprint mismatch.
+
+    Returns None if that isn't possible: the fields must be scalar
+    primitives, preceded only by other scalar primitives.
+    """
+    slots = list(getattr(msg_type, "__slots__", []))
+    typenames = list(getattr(msg_type, "__typenames__", []))
+    dimensions = list(getattr(msg_type, "__dimensions__", []))
+    get_fingerprint = getattr(msg_type, "_get_packed_fingerprint", None)
+    if (
+        get_fingerprint is None
+        or len(typenames) != len(slots)
+        or len(dimensions) != len(slots)
+        or not all(name in slots for name in field_names)
+    ):
+        return None
+    last = max(slots.index(name) for name in field_names)
+    fmt = ">"
+    unpacked = []  # Names of the fields in the order struct returns them
+    for name, typename, dims in zip(
+        slots[: last + 1], typenames[: last + 1], dimensions[: last + 1]
+    ):
+        code = LCM_STRUCT_CODES.get(typename)
+        if code is None or dims is not None:
+            return None
+        if name in field_names:
+            fmt += code
+            unpacked.append(name)
+        else:
+            fmt += f"{struct.calcsize('>' + code)}x"  # skip
+    unpack_from = struct.Struct(fmt).unpack_from
+    fingerprint = get_fingerprint()
+    if unpacked == list(field_names):
+        reorder = None
+    else:
+        reorder = operator.itemgetter(*[unpacked.index(name) for name in field_names])
+
+    def unpack_fields(data):
+        if data[:8] != fingerprint:
+            raise ValueError("Decode error")
+        fields = unpack_from(data, 8)
+        return fields if reorder is None else reorder(fields)
+
+    return unpack_fields
+
+
+# Building a datetime and calling strftime for every feature and tick label
+# is surprisingly slow. Instead, split timestamps with integer arithmetic;
+# the date/time prefix only changes once a second (and tick labels repeat
+# on every redraw), so it is cached.
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def split_seconds(tt):
+    """
+    Split seconds since the epoch into (whole seconds, microseconds),
+    rounding to the nearest microsecond.
+    """
+    # Same rounding as datetime.utcfromtimestamp
+    sec = math.floor(tt)
+    usec = round((tt - sec) * 1e6)
+    if usec >= 1000000:
+        sec += 1
+        usec -= 1000000
+    return sec, usec
+
+
+@functools.lru_cache(maxsize=16)
+def format_day(day):
+    """YYYY-MM-DD for the given number of days since the epoch."""
+    return (EPOCH + datetime.timedelta(days=day)).strftime("%Y-%m-%d")
+
+
+@functools.lru_cache(maxsize=256)
+def format_second(sec, sep=" "):
+    """Equivalent to strftime(f"%Y-%m-%d{sep}%H:%M:%S") for whole seconds."""
+    day, sec = divmod(sec, 86400)
+    hh, sec = divmod(sec, 3600)
+    mm, ss = divmod(sec, 60)
+    return f"{format_day(day)}{sep}{hh:02d}:{mm:02d}:{ss:02d}"
+
+
+def format_time(tt):
+    """Equivalent to strftime("%H:%M:%S.%f")"""
+    sec, usec = split_seconds(tt)
+    return f"{format_second(sec)[-8:]}.{usec:06d}"
+
+
+def format_feature_time(tt):
+    """Equivalent to strftime("%Y-%m-%d %H:%M:%S:%f")"""
+    sec, usec = split_seconds(tt)
+    return f"{format_second(sec)}:{usec:06d}"
+
+
+def format_tick_time(tt, _pos=None):
+    """Equivalent to strftime("%Y-%m-%d\n%H:%M:%S")"""
+    sec, _ = split_seconds(tt)
+    return format_second(sec, "\n")
+
+
+class GrowableArray(object):
+    """
+    Append-only 2D float array with amortized O(1) appends.
+
+    np.append copies the full history on every call, which gets expensive
+    over the course of a dive. Instead, keep a preallocated buffer and
+    double its capacity whenever it fills up.
+
+    The buffer is column-major, so each column of a snapshot is a contiguous
+    view. np.searchsorted copies non-contiguous inputs, which would mean
+    copying the whole time column on every lookup.
+    """
+
+    def __init__(self, ncols, capacity=4096):
+        self._buf = np.empty((capacity, ncols), dtype=np.float64, order="F")
+        self._len = 0
+        self._view = self._buf[:0]
+
+    def __len__(self):
+        return self._len
+
+    def append(self, row):
+        if self._len == self._buf.shape[0]:
+            buf = np.empty(
+                (2 * self._buf.shape[0], self._buf.shape[1]),
+                dtype=self._buf.dtype,
+                order="F",
+            )
+            buf[: self._len] = self._buf[: self._len]
+            self._buf = buf
+        self._buf[self._len] = row
+        self._len += 1
+        self._view = self._buf[: self._len]
+
+    def extend(self, rows):
+        """Append every row of a 2D array, with at most one reallocation."""
+        new_len = self._len + len(rows)
+        if new_len > self._buf.shape[0]:
+            capacity = self._buf.shape[0]
+            while capacity < new_len:
+                capacity *= 2
+            buf = np.empty(
+                (capacity, self._buf.shape[1]), dtype=self._buf.dtype, order="F"
+            )
+            buf[: self._len] = self._buf[: self._len]
+            self._buf = buf
+        self._buf[self._len : new_len] = rows
+        self._len = new_len
+        self._view = self._buf[:new_len]
+
+    @property
+    def data(self):
+        """
+        Snapshot view of the valid rows.
+
+        Safe to call from another thread while a single writer appends,
+        without a lock: the writer fills in the new rows and then rebinds
+        the view in one step, so a reader (a single attribute load) never
+        pairs a stale buffer with a newer length.
+        """
+        return self._view
+
+
+# How many samples per field may be queued between refreshes before we start
+# dropping the oldest. At typical decimated rates, this is hours of data.
+MAX_PENDING_SAMPLES = 10000
+
+
+class SampleQueue(object):
+    """
+    Bounded FIFO of (timestamp, value) samples waiting to be plotted.
+
+    If refreshes stall (or are paused) long enough for it to fill up, the
+    oldest samples are dropped rather than letting memory grow without
+    bound; drain() reports how many were lost.
+    """
+
+    def __init__(self, maxlen=MAX_PENDING_SAMPLES):
+        self.samples = collections.deque(maxlen=maxlen)
+        self.num_dropped = 0
+
+    def __len__(self):
+        return len(self.samples)
+
+    def append(self, sample):
+        if len(self.samples) == self.samples.maxlen:
+            self.num_dropped += 1
+        self.samples.append(sample)
+
+    def clear(self):
+        self.samples.clear()
+        self.num_dropped = 0
+
+    def drain(self, key):
+        """
+        Return all queued samples and empty the queue, logging if any
+        samples had to be dropped.
+        """
+        samples = list(self.samples)
+        if self.num_dropped > 0:
+            errmsg = (
+                f"Dropped {self.num_dropped} samples for {key}; plotting fell behind"
+            )
+            log.warning(errmsg)
+            QgsMessageLog.logMessage(errmsg)
+        self.clear()
+        return samples
+
+
 class MapLayerPlotter(QtCore.QObject):
     """
     Class in charge of managing all QGIS map/layer/etc. interfaces.
@@ -94,22 +331,50 @@ class MapLayerPlotter(QtCore.QObject):
         self.lc = lc
         # layer_name -> QgsVectorLayer to add features to
         self.layers = {}
+        # Keys of layers whose spatial index has been built (see
+        # flush_pending_samples). Tracked here because the provider's
+        # hasSpatialIndex() needs QGIS >= 3.14.
+        self.indexed_layers = set()
+        # layer_name -> SampleQueue of (timestamp, value) waiting to be added
+        # to the layer. Interpolating and adding features one at a time is slow, so
+        # maybe_refresh does it in bulk.
+        self.pending_samples = {}
+        # Keys of layers whose contents changed since the last repaint
+        self.dirty_layers = set()
+        self.cursor_dirty = False
+        # While paused, data is still added to the layers but not repainted.
+        self.paused = False
 
         # Everything NUI does is in the AlvinXY coordinate frame, with origin
         # as defined in the DIVE_INI message. So, we can't add data to layers
         # until the first message has been received.
         self.lat0 = None
         self.lon0 = None
+        # Degrees per meter at the origin; these only depend on lat0, so
+        # cache them rather than recomputing for every feature. Stored as
+        # reciprocals so conversion is a multiply rather than a divide.
+        self.inv_mdeglat0 = None
+        self.inv_mdeglon0 = None
         self.projection_initialized = False  # TODO: use 'self.lat0 is None' instead?
-        self.received_origin.connect(self.initialize_origin)
+        # Emitted from the LCM thread; be explicit that it's queued onto ours.
+        self.received_origin.connect(self.initialize_origin, QtCore.Qt.QueuedConnection)
+
+        # Only the timestamp and position are used, so when the message
+        # layout allows, skip decoding the rest of it.
+        self.unpack_statexy = make_field_unpacker(statexy_t, ["utime", "x", "y"])
 
         self.subscribers = {}
         self.subscribers["DIVE_INI"] = self.lc.subscribe(
             "DIVE_INI", self.handle_dive_ini
         )
 
-        self.statexy_lock = threading.Lock()
-        self.statexy_data = None
+        # Columns are time (seconds since epoch), x, y
+        # Only the LCM thread appends; readers in the Qt thread grab a
+        # snapshot view without locking (see GrowableArray.data).
+        self.statexy_data = GrowableArray(3)
+        # Timestamp of the newest row, so the LCM callback can reject stale
+        # messages without touching the array.
+        self.statexy_last_t = -np.inf
         self.subscribers["FIBER_STATEXY"] = self.lc.subscribe(
             "FIBER_STATEXY", self.handle_statexy
         )
@@ -123,18 +388,23 @@ class MapLayerPlotter(QtCore.QObject):
         self.update_timer.timeout.connect(self.maybe_refresh)
         self.update_timer.setSingleShot(False)
         self.update_timer.start(500)  # ms
+        self.repaint_timer = QtCore.QTimer()
+        self.repaint_timer.setSingleShot(True)
+        self.repaint_timer.setInterval(16)  # ms
+        self.repaint_timer.timeout.connect(self.repaint)
 
     def closeEvent(self, _event):
-        print("MapLayerPlotter.closeEvent()")
+        log.debug("MapLayerPlotter.closeEvent()")
         self.update_timer.stop()
+        self.repaint_timer.stop()
 
         for key, sub in self.subscribers.items():
-            print(f"Unsubscribing from {key}")
+            log.debug(f"Unsubscribing from {key}")
             try:
                 self.lc.unsubscribe(sub)
             except Exception as ex:
                 # If we've already unsubscribed from DIVE_INI, this will fail.
-                print(ex)
+                log.debug(ex)
 
     def setup_groups(self):
         """
@@ -143,10 +413,10 @@ class MapLayerPlotter(QtCore.QObject):
         Re-use the appropriate groups and layers if they exist, in order to
         let the user save stylings in their QGIS project.
         """
-        print("setup_groups")
+        log.debug("setup_groups")
         # To start with, only add the cursor to the map
         self.root = QgsProject.instance().layerTreeRoot()
-        print("got root. Is none? ", self.root is None)
+        log.debug(f"got root. Is none? {self.root is None}")
         self.nui_group = self.root.findGroup("NUI")
         if self.nui_group is None:
             self.nui_group = self.root.insertGroup(0, "NUI")
@@ -155,28 +425,30 @@ class MapLayerPlotter(QtCore.QObject):
             self.scalar_data_group = self.nui_group.insertGroup(0, "Scalar Data")
 
     def setup_cursor_layer(self):
-        print("setup_cursor_layer")
+        log.debug("setup_cursor_layer")
         self.cursor_layer = None
+        # ID of the single feature in the cursor layer. Created on first
+        # update, then moved in-place by subsequent updates.
+        self.cursor_fid = None
         for ll in self.scalar_data_group.children():
-            print(ll.name())
+            log.debug(ll.name())
             if (
                 isinstance(ll, qgis.core.QgsLayerTreeLayer)
                 and ll.name() == "Scalar Data Cursor"
             ):
                 self.cursor_layer = ll.layer()  # ll is a QgsLayerTreeLayer
-        print(
-            "Tried to find cursor_layer in NUI group. Is none?",
-            self.cursor_layer is None,
+        log.debug(
+            f"Tried to find cursor_layer in NUI group. Is none? {self.cursor_layer is None}"
         )
 
         # TODO: Probably also need to check whether it's the right type of layer...
         if self.cursor_layer is None:
             self.cursor_layer = QgsVectorLayer(
-                "Point?crs=epsg:4326&field=time:string(30)&index=yes",
+                "Point?crs=epsg:4326&field=time:string(30)",
                 "Scalar Data Cursor",
                 "memory",
             )
-            print("...Created cursor_layer")
+            log.debug("...Created cursor_layer")
             QgsProject.instance().addMapLayer(self.cursor_layer, False)
             self.scalar_data_group.addLayer(self.cursor_layer)
 
@@ -192,14 +464,47 @@ class MapLayerPlotter(QtCore.QObject):
         In the Widget, I'm using signals/slots to guarantee that all layer-related
         stuff happens in a single thread (I hope?)
 
-        I considered adding a flag to see if we need to redraw, but haven't yet.
-        (This will also become more important when we start drawing time series plots.)
+        Only layers that have had features added/removed since the last
+        refresh get repainted; if none have, this doesn't even schedule a
+        repaint (cursor moves request their own).
+        """
+        self.flush_pending_samples()
+        if len(self.dirty_layers) > 0:
+            self.request_repaint()
+
+    def request_repaint(self):
+        """
+        Schedule a repaint of whatever has changed. Requests that arrive
+        in quick succession (data refresh + cursor move) share one repaint.
         """
+        if self.paused:
+            return  # resume() repaints whatever changed in the meantime
+        if not self.repaint_timer.isActive():
+            self.repaint_timer.start()
+
+    def pause(self):
+        """Stop repainting; new data keeps being added to the layers."""
+        self.paused = True
+        self.repaint_timer.stop()
+
+    def resume(self):
+        self.paused = False
+        self.request_repaint()
+
+    @QtCore.pyqtSlot()
+    def repaint(self):
+        if len(self.dirty_layers) == 0 and not self.cursor_dirty:
+            return
+        dirty_layers = self.dirty_layers
+        self.dirty_layers = set()
+        cursor_dirty = self.cursor_dirty
+        self.cursor_dirty = False
+
         # The other problem is updating the bounds of the shading, ratehr than just not plotting points that are off the edges.
         if self.iface.mapCanvas().isCachingEnabled():
-            # TODO: Should we check per-layer if it needs to be redrawn?
-            #    Maybe only redraw visible layers?
-            for key, layer in self.layers.items():
+            # TODO: Maybe only redraw visible layers?
+            for key in dirty_layers:
+                layer = self.layers.get(key)
                 # I'm not sure how this wound up getting called while layer was None.
                 # I thought all things touching the layer were in the same thread,
                 # and that layer creation would finish before this was called.
@@ -207,21 +512,92 @@ class MapLayerPlotter(QtCore.QObject):
                     try:
                         layer.triggerRepaint()
                     except Exception as ex:
-                        print(f"Failed to repaint layer {key}")
+                        log.warning(f"Failed to repaint layer {key}")
+            if cursor_dirty:
+                self.cursor_layer.triggerRepaint()
         else:
             self.iface.mapCanvas().refresh()
 
+    def flush_pending_samples(self):
+        for key, queue in self.pending_samples.items():
+            if len(queue) == 0:
+                continue
+            samples = queue.drain(key)
+            layer = self.layers.get(key)
+            if layer is None or not layer.isValid():
+                continue
+            features = self.make_features(samples)
+            if len(features) == 0:
+                continue
+            provider = layer.dataProvider()
+            provider.addFeatures(features)
+            # Layers are created without a spatial index so that the
+            # initial batch isn't inserted one-by-one into the tree;
+            # build it in bulk once there's data.
+            if key not in self.indexed_layers:
+                provider.createSpatialIndex()
+                self.indexed_layers.add(key)
+            layer.updateExtents()
+            self.dirty_layers.add(key)
+
+    def make_features(self, samples):
+        """
+        Convert list of (timestamp, value) into QgsFeatures, interpolating
+        positions for the whole batch at once.
+        """
+        # One bulk conversion; both columns come back as python floats via
+        # tolist() below, rather than being unpacked sample by sample.
+        batch = np.array(samples, dtype=np.float64)
+        tts = batch[:, 0]
+        # Do the interpolation in NuiXY coords, then transform into lat/lon
+        # before adding the feature to the layer.
+        # This is usually OK, but will lead to smearing data when we have nav shifts.
+        xy = self.interp_statexy(tts)
+        if xy is None:
+            return []
+        xxs, yys = xy
+        lats, lons = self.xy2ll_vec(xxs, yys)
+        # setAttributes copies its input, so one scratch list can be reused
+        # for every feature. tolist() converts to python floats in bulk.
+        attributes = [0.0, 0.0, "", 0.0]
+        features = []
+        for tt, val, xx, yy, lat, lon in zip(
+            tts.tolist(),
+            batch[:, 1].tolist(),
+            np.ravel(xxs).tolist(),
+            np.ravel(yys).tolist(),
+            np.ravel(lats).tolist(),
+            np.ravel(lons).tolist(),
+        ):
+            feature = qgis.core.QgsFeature()
+            # The geometry takes ownership of the QgsPoint, so this skips
+            # the intermediate QgsPointXY that fromPointXY would copy from.
+            geom = qgis.core.QgsGeometry(qgis.core.QgsPoint(lon, lat))
+            # NOTE(lindzey): We could probably go back to this. The issue was using the wrong
+            # EPSG code on the layers themselves, rather than AlvinXY vs something else.
+            # geom.transform(self.tr)
+            feature.setGeometry(geom)
+            attributes[0] = xx
+            attributes[1] = yy
+            attributes[2] = format_feature_time(tt)
+            attributes[3] = val
+            feature.setAttributes(attributes)
+            features.append(feature)
+        return features
+
     @QtCore.pyqtSlot(float, float)
     def initialize_origin(self, lon0, lat0):
-        print(f"initialize_origin. lon={lon0}, lat={lat0}")
+        log.debug(f"initialize_origin. lon={lon0}, lat={lat0}")
         self.lon0 = lon0
         self.lat0 = lat0
+        self.inv_mdeglat0 = 1.0 / float(mdeglat(lat0))
+        self.inv_mdeglon0 = 1.0 / float(mdeglon(lat0))
         self.crs = QgsCoordinateReferenceSystem()
         # AlvinXY uses the Clark 1866 ellipsoid; it predates WGS84
         self.crs.createFromProj(
             f"+proj=ortho +lat_0={self.lat0} +lon_0={self.lon0} +ellps=clrk66"
         )
-        print(f"Created CRS! isValid = {self.crs.isValid()}")
+        log.debug(f"Created CRS! isValid = {self.crs.isValid()}")
         self.crs_name = "NuiXY"
         self.crs.saveAsUserCrs(self.crs_name)
         # For some reason, setting this custom CRS on a layer doesn't work, but it's fine
@@ -230,65 +606,89 @@ class MapLayerPlotter(QtCore.QObject):
         self.tr = QgsCoordinateTransform(self.crs, self.map_crs, QgsProject.instance())
         self.projection_initialized = True
 
+    def xy2ll_vec(self, xx, yy):
+        """
+        Convert NuiXY coordinates to lat/lon using the cached origin constants.
+        Accepts either scalars or np.ndarrays.
+        """
+        lon = xx * self.inv_mdeglon0 + self.lon0
+        lat = yy * self.inv_mdeglat0 + self.lat0
+        return lat, lon
+
+    def interp_statexy(self, tt):
+        """
+        Linearly interpolate vehicle position at time(s) tt, clamping to the
+        first/last fix. Accepts either a scalar or an np.ndarray of times.
+
+        Returns None if we haven't received any STATEXY yet.
+        Since x and y share timestamps, one binary search (over the
+        contiguous time column) suffices.
+        """
+        statexy = self.statexy_data.data
+        if len(statexy) == 0:
+            return None
+        # In realtime operation, data is usually newer than the latest fix,
+        # in which case we just use that fix and can skip the search.
+        if len(statexy) == 1 or np.min(tt) >= statexy[-1, 0]:
+            zeros = np.zeros_like(tt, dtype=np.float64)
+            return zeros + statexy[-1, 1], zeros + statexy[-1, 2]
+        times = statexy[:, 0]
+        # handle_statexy guarantees strictly increasing timestamps
+        idx = np.clip(np.searchsorted(times, tt), 1, len(times) - 1)
+        lo = statexy[idx - 1]
+        hi = statexy[idx]
+        ww = np.clip((tt - lo[..., 0]) / (hi[..., 0] - lo[..., 0]), 0.0, 1.0)
+        xx = lo[..., 1] + ww * (hi[..., 1] - lo[..., 1])
+        yy = lo[..., 2] + ww * (hi[..., 2] - lo[..., 2])
+        return xx, yy
+
     @QtCore.pyqtSlot(float)
     def update_cursor(self, tt):
         if self.lon0 is None:
             # msg = "Origin not initialized; cannot update cursor"
-            # print(msg)
+            # log.debug(msg)
             return
 
-        with self.statexy_lock:
-            xx = np.interp(tt, self.statexy_data[:, 0], self.statexy_data[:, 1])
-            yy = np.interp(tt, self.statexy_data[:, 0], self.statexy_data[:, 2])
-        lat, lon = xy2ll(xx, yy, self.lat0, self.lon0)
-        pt = qgis.core.QgsPointXY(lon, lat)
-        geom = qgis.core.QgsGeometry.fromPointXY(pt)
-        # I tried to figure out how to just update the existing feature,
-        # but couldn't get its new coords to show in the map.
-        cursor_feature = qgis.core.QgsFeature()
-        cursor_feature.setGeometry(geom)
-        dt = datetime.datetime.utcfromtimestamp(tt)
-        cursor_feature.setAttributes([dt.strftime("%H:%M:%S.%f")])
-        with qgis.core.edit(self.cursor_layer):
-            self.cursor_layer.dataProvider().truncate()
-            self.cursor_layer.dataProvider().addFeature(cursor_feature)
-
-        # If possible, just update this layer. Otherwise, wait for global refresh.
-        if self.iface.mapCanvas().isCachingEnabled():
-            self.cursor_layer.triggerRepaint()
+        xy = self.interp_statexy(tt)
+        if xy is None:
+            return
+        xx, yy = xy
+        lat, lon = self.xy2ll_vec(xx, yy)
+        geom = qgis.core.QgsGeometry(qgis.core.QgsPoint(float(lon), float(lat)))
+        time_str = format_time(tt)
+        provider = self.cursor_layer.dataProvider()
+        if self.cursor_fid is None:
+            # Clear out any cursor saved in the project, then create ours.
+            cursor_feature = qgis.core.QgsFeature()
+            cursor_feature.setGeometry(geom)
+            cursor_feature.setAttributes([time_str])
+            provider.truncate()
+            success, features = provider.addFeatures([cursor_feature])
+            if success:
+                self.cursor_fid = features[0].id()
+        else:
+            # Modifying the provider directly skips the layer's edit buffer;
+            # the triggerRepaint below is what makes the new coords show up.
+            provider.changeGeometryValues({self.cursor_fid: geom})
+            provider.changeAttributeValues({self.cursor_fid: {0: time_str}})
+
+        self.cursor_dirty = True
+        self.request_repaint()
 
     @QtCore.pyqtSlot(str, float, float)
     def update_data(self, key, tt, val):
         if self.lon0 is None:
             msg = "Origin not initialized; cannot plot data"
-            print(msg)
+            log.debug(msg)
             return
         if key not in self.layers:
             # msg = f"No layer matching {key}; cannot plot data"
-            # print(msg)
+            # log.debug(msg)
             return
-        # Do the interpolation in NuiXY coords, then transform into lat/lon
-        # before adding the feature to the layer.
-        # This is usually OK, but will lead to smearing data when we have nav shifts.
-        with self.statexy_lock:
-            xx = np.interp(tt, self.statexy_data[:, 0], self.statexy_data[:, 1])
-            yy = np.interp(tt, self.statexy_data[:, 0], self.statexy_data[:, 2])
-        feature = qgis.core.QgsFeature()
-        lat, lon = xy2ll(xx, yy, self.lat0, self.lon0)
-        pt = qgis.core.QgsPointXY(lon, lat)
-        geom = qgis.core.QgsGeometry.fromPointXY(pt)
-        # NOTE(lindzey): We could probably go back to this. The issue was using the wrong
-        # EPSG code on the layers themselves, rather than AlvinXY vs something else.
-        # geom.transform(self.tr)
-        feature.setGeometry(geom)
-        dt = datetime.datetime.utcfromtimestamp(tt)
-        feature.setAttributes(
-            [float(xx), float(yy), dt.strftime("%Y-%m-%d %H:%M:%S:%f"), val]
-        )
-        self.layers[key].dataProvider().addFeature(feature)
+        self.pending_samples[key].append((tt, val))
 
     def handle_dive_ini(self, channel, data):
-        print("handle_dive_ini")
+        log.debug("handle_dive_ini")
         QgsMessageLog.logMessage("handle_dive_ini")
         msg = dive_t.decode(data)
         QgsMessageLog.logMessage(
@@ -298,7 +698,7 @@ class MapLayerPlotter(QtCore.QObject):
             self.lc.unsubscribe(self.subscribers[channel])
             self.received_origin.emit(msg.origin_longitude, msg.origin_latitude)
         except Exception as ex:
-            print("Could not unsubscribe from DIVE_INI")
+            log.warning("Could not unsubscribe from DIVE_INI")
 
     def handle_statexy(self, channel, data):
         """ "
@@ -309,70 +709,75 @@ class MapLayerPlotter(QtCore.QObject):
             (I don't think it matters terribly -- it's always best-estimate, and I
             don't think we'd ever want to correct for offsets.)
         """
-        msg = statexy_t.decode(data)
+        if self.unpack_statexy is not None:
+            utime, xx, yy = self.unpack_statexy(data)
+        else:
+            msg = statexy_t.decode(data)
+            utime, xx, yy = msg.utime, msg.x, msg.y
 
-        with self.statexy_lock:
-            if self.statexy_data is None:
-                self.statexy_data = np.array([[msg.utime / 1.0e6, msg.x, msg.y]])
-            else:
-                new_t = msg.utime / 1.0e6
-                last_t = self.statexy_data[-1][0]
-                if new_t > last_t:
-                    self.statexy_data = np.append(
-                        self.statexy_data,
-                        [[msg.utime / 1.0e6, msg.x, msg.y]],
-                        axis=0,
-                    )
-                else:
-                    # Ignore stale data. Will occasionally get out-of-order
-                    # FIBER_STATEXY messages, but the real intent here it to not have
-                    # ACOMMS_STATEXY overwrite newer FIBER_STATEXY ones.
-                    # QgsMessageLog.logMessage(f"Received stale msg: {channel}")
-                    pass
+        new_t = utime / 1.0e6
+        if new_t > self.statexy_last_t:
+            self.statexy_data.append((new_t, xx, yy))
+            self.statexy_last_t = new_t
+        else:
+            # Ignore stale data. Will occasionally get out-of-order
+            # FIBER_STATEXY messages, but the real intent here it to not have
+            # ACOMMS_STATEXY overwrite newer FIBER_STATEXY ones.
+            # QgsMessageLog.logMessage(f"Received stale msg: {channel}")
+            pass
 
     @QtCore.pyqtSlot(str)
     def clear_field(self, key):
-        print(f"MapLayerPlotter.clear_field: {key}")
+        log.debug(f"MapLayerPlotter.clear_field: {key}")
         if key not in self.layers:
             msg = f"No layer matching {key}; cannot clear data"
-            print(msg)
+            log.warning(msg)
             return
-        with qgis.core.edit(self.layers[key]):
-            self.layers[key].dataProvider().truncate()
+        self.pending_samples[key].clear()
+        # Provider-level changes don't need an edit session on the layer
+        # (same as flush_pending_samples and update_cursor).
+        self.layers[key].dataProvider().truncate()
+        self.layers[key].updateExtents()
+        self.dirty_layers.add(key)
+        self.request_repaint()
 
     @QtCore.pyqtSlot(str)
     def remove_field(self, key):
-        print(f"MapLayerPlotter.remove_field: {key}")
+        log.debug(f"MapLayerPlotter.remove_field: {key}")
         if key not in self.layers:
             msg = f"No layer matching {key}; cannot remove field"
-            print(msg)
+            log.warning(msg)
             return
         layer_id = self.layers[key].id()
         self.layers.pop(key)
+        self.pending_samples.pop(key)
+        self.dirty_layers.discard(key)
+        self.indexed_layers.discard(key)
         QgsProject.instance().removeMapLayers([layer_id])
 
     # QUESTION: should this be a slot too?
     def add_field(self, key, layer_name):
         self.layers[key] = None
+        self.pending_samples[key] = SampleQueue()
 
-        print("Searching scalar data group's children...")
+        log.debug("Searching scalar data group's children...")
         for ll in self.scalar_data_group.children():
-            print(ll.name())
+            log.debug(ll.name())
             if isinstance(ll, qgis.core.QgsLayerTreeLayer) and ll.name() == layer_name:
-                print(f"Found existing layer for {layer_name}")
+                log.debug(f"Found existing layer for {layer_name}")
                 self.layers[key] = ll.layer()
                 # Don't auto-delete existing features; user has button to do so if desired
         if self.layers[key] is None:
-            print("...creating layer.")
+            log.debug("...creating layer.")
             # TODO: Also need to double-check that it's the right type of layer
             self.layers[key] = QgsVectorLayer(
-                "Point?crs=epsg:4326&field=x:double&field=y:double&field=time:string(30)&field=value:double&index=yes",
+                "Point?crs=epsg:4326&field=x:double&field=y:double&field=time:string(30)&field=value:double",
                 layer_name,
                 "memory",
             )
             QgsProject.instance().addMapLayer(self.layers[key], False)
             self.scalar_data_group.addLayer(self.layers[key])
-        print(f"Added layer '{layer_name}' to map")
+        log.debug(f"Added layer '{layer_name}' to map")
 
 
 class TimeSeriesPlotter(QtCore.QObject):
@@ -383,12 +788,18 @@ class TimeSeriesPlotter(QtCore.QObject):
         ######
         # Handle data stuff
 
-        # layer_name -> np.array where 1st column is time and 2nd is data
+        # layer_name -> GrowableArray where 1st column is time and 2nd is data
         self.data = {}
         # layer_name -> axes object for plotting
         self.data_axes = {}
         self.data_plots = {}
         self.ylims = {}
+        # layer_name -> (i0, i1, vmin, vmax): extrema of data[i0:i1] as of the
+        # last plot update, so sliding the window forward only has to look
+        # at the rows that entered or left it (see visible_extrema).
+        self.window_extrema = {}
+        # layer_name -> SampleQueue of (timestamp, value) not yet in self.data
+        self.pending_samples = {}
 
         # We have two ways of selecting the time range:
         # 1) click-and-drag across desired range
@@ -404,20 +815,21 @@ class TimeSeriesPlotter(QtCore.QObject):
         # * if positive, plot all data sense that timestamp
         self.time_limit = None
 
-        # We need our own instance of a color cycler because I'm using multiple axes
+        # We need our own color assignment because I'm using multiple axes
         # on top of each other, and by default, each axis gets its own cycler.
-        self.color_cycler = plt.rcParams["axes.prop_cycle"]()
+        self.colors = matplotlib.rcParams["axes.prop_cycle"].by_key()["color"]
+        self.num_colors_used = 0
 
         ######
         # Handle GUI stuff
         self.fig = Figure((8.0, 4.0), dpi=100)
         self.ax = self.fig.add_axes([0.1, 0.2, 0.8, 0.75])
-        self.cursor_vline = self.ax.axvline(0, 0, 1, ls="--", color="grey")
-        self.time_formatter = FuncFormatter(
-            lambda tt, pos: datetime.datetime.utcfromtimestamp(tt).strftime(
-                "%Y-%m-%d\n%H:%M:%S"
-            )
+        # Data and cursor are drawn with blitting on top of a cached background,
+        # so they're marked animated to keep them out of the full redraw.
+        self.cursor_vline = self.ax.axvline(
+            0, 0, 1, ls="--", color="grey", animated=True
         )
+        self.time_formatter = FuncFormatter(format_tick_time)
         self.ax.xaxis.set_major_formatter(self.time_formatter)
         self.ax.xaxis.set_tick_params(which="both", labelrotation=45)
         self.ax.tick_params(
@@ -438,6 +850,23 @@ class TimeSeriesPlotter(QtCore.QObject):
         self.canvas.setFocusPolicy(QtCore.Qt.NoFocus)
         self.canvas.mpl_connect("button_press_event", self.on_button_press_event)
         self.canvas.mpl_connect("button_release_event", self.on_button_release_event)
+        self.canvas.mpl_connect("draw_event", self.on_draw_event)
+        # Everything but the animated artists, as of the last full draw,
+        # and the axis limits it was drawn with.
+        self.background = None
+        self.background_limits = None
+        # Whether anything has changed since the last maybe_refresh
+        self.plot_dirty = False
+        # While paused, data is still collected but not drawn.
+        self.paused = False
+
+    def pause(self):
+        """Stop redrawing; new data keeps being collected."""
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+        self.maybe_refresh()
 
     def closeEvent(self, event):
         pass
@@ -449,8 +878,9 @@ class TimeSeriesPlotter(QtCore.QObject):
         data_xx, data_yy = self.ax.transData.inverted().transform((event.x, event.y))
         if event.button == MouseButton.RIGHT and self.right_click_t0 is not None:
             self.right_click_t1 = data_xx
+            self.plot_dirty = True
         else:
-            print(f"Got unhandled button release event: {event}")
+            log.debug(f"Got unhandled button release event: {event}")
 
     def on_button_press_event(self, event):
         """
@@ -468,17 +898,21 @@ class TimeSeriesPlotter(QtCore.QObject):
             )
 
         if event.button == MouseButton.LEFT:
-            tt = data_xx
-            self.cursor_vline.set_xdata(tt)
-            self.cursor_moved.emit(tt)
-            # Don't wait for the 2Hz update; user will expect something more responsive.
-            self.maybe_refresh()
+            self.move_cursor(data_xx)
         elif event.button == MouseButton.RIGHT:
             # TODO: Store the time for setting left/right time
             self.right_click_t0 = data_xx
 
+    def move_cursor(self, tt):
+        self.cursor_vline.set_xdata(tt)
+        self.plot_dirty = True
+        self.cursor_moved.emit(tt)
+        # Don't wait for the 2Hz update; user will expect something more responsive.
+        self.maybe_refresh()
+
     def add_field(self, key, layer_name):
-        self.data[key] = None
+        self.data[key] = GrowableArray(2)
+        self.pending_samples[key] = SampleQueue()
         self.data_axes[key] = self.ax.twinx()
         self.ylims[key] = [None, None]
 
@@ -513,29 +947,50 @@ class TimeSeriesPlotter(QtCore.QObject):
         # Set colors for each axes
         self.data_axes[key].set_ylabel(layer_name)
         self.data_axes[key].yaxis.set_major_formatter(ScalarFormatter(useOffset=False))
-        color = next(self.color_cycler)["color"]
+        color = self.colors[self.num_colors_used % len(self.colors)]
+        self.num_colors_used += 1
         self.data_axes[key].yaxis.label.set_color(color)
         self.data_axes[key].tick_params(axis="y", colors=color)
         (self.data_plots[key],) = self.data_axes[key].plot(
-            [], [], ".", markersize=1, color=color, label=layer_name
+            [], [], ".", markersize=1, color=color, label=layer_name, animated=True
         )
+        # The new axis' label and ticks need a full draw, even if no samples
+        # arrive for a while.
+        self.plot_dirty = True
 
     @QtCore.pyqtSlot(str)
     def remove_field(self, key):
-        print(f"TimeSeriesPlotter.remove_field: {key}")
+        log.debug(f"TimeSeriesPlotter.remove_field: {key}")
         self.data_axes[key].remove()
         self.data_axes.pop(key)
         self.data_plots.pop(key)
         self.data.pop(key)
+        self.pending_samples.pop(key)
         self.ylims.pop(key)
+        self.window_extrema.pop(key, None)
+        self.plot_dirty = True
 
     @QtCore.pyqtSlot()
     def maybe_refresh(self):
         """
         To avoid updating too frequently, we redraw at a fixed rate.
-        This one just updates the scalar data plot.
+        This one just updates the scalar data plot, and does nothing if
+        nothing has changed since the last refresh.
         """
-        # This somewhat duplicates the logic in update_data (which needs to figure
+        if self.paused:
+            # Keep moving samples out of the bounded queues, but leave
+            # plot_dirty set so that resume() draws them.
+            self.flush_pending_samples()
+            return
+        if not self.plot_dirty:
+            return
+        self.plot_dirty = False
+
+        self.flush_pending_samples()
+        for key in self.data_plots:
+            self.update_plot(key)
+
+        # This somewhat duplicates the logic in update_plot (which needs to figure
         # out which points are in the time bounds in order to not plot unnecessarily
         # large numbers of points), but here we look at all datasets.
         if self.right_click_t0 is not None and self.right_click_t1 is not None:
@@ -545,10 +1000,11 @@ class TimeSeriesPlotter(QtCore.QObject):
             tmin = np.inf
             tmax = -np.inf
             for key, data in self.data.items():
-                if data is None:
+                if len(data) == 0:
                     continue
-                tmin = min(tmin, np.min(data[:, 0]))
-                tmax = max(tmax, np.max(data[:, 0]))
+                # data is only ever appended in time order
+                tmin = min(tmin, data.data[0, 0])
+                tmax = max(tmax, data.data[-1, 0])
 
             if self.time_limit is None:
                 t0 = tmin
@@ -558,22 +1014,62 @@ class TimeSeriesPlotter(QtCore.QObject):
                 t0 = self.time_limit
             t1 = tmax
 
+        # Twinned axes share this xlim, so only touch it (and mark every axes
+        # as stale) if it actually changed.
         # If we don't have data yet, will be nan, which isn't valid. EAFP.
-        try:
-            self.ax.set_xlim([t0, t1])
-        except Exception as ex:
-            pass
+        if tuple(self.ax.get_xlim()) != (t0, t1):
+            try:
+                self.ax.set_xlim([t0, t1])
+            except Exception as ex:
+                pass
 
-        self.canvas.draw_idle()
-        self.canvas.flush_events()
+        # A full redraw is only necessary if the axes/ticks have changed.
+        # Both paths just schedule a paint with Qt, which merges repeated
+        # requests; don't force a synchronous one with flush_events().
+        if self.background is not None and self.background_limits == self.get_limits():
+            self.blit_artists()
+        else:
+            self.canvas.draw_idle()
+
+    def get_limits(self):
+        """
+        Everything that's baked into the cached background.
+        """
+        limits = [tuple(self.ax.get_xlim())]
+        for key, axes in self.data_axes.items():
+            limits.append((key, axes.get_visible(), tuple(axes.get_ylim())))
+        return limits
+
+    def on_draw_event(self, _event):
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.background_limits = self.get_limits()
+        # The paint that follows a full draw shows the whole figure, so just
+        # render the animated artists into it. Blitting from here would
+        # trigger a recursive repaint (the draw may be running in paintEvent).
+        self.draw_animated_artists()
+
+    def draw_animated_artists(self):
+        for key, plot in self.data_plots.items():
+            if self.data_axes[key].get_visible():
+                self.data_axes[key].draw_artist(plot)
+        self.ax.draw_artist(self.cursor_vline)
+
+    def blit_artists(self):
+        self.canvas.restore_region(self.background)
+        self.draw_animated_artists()
+        # All the animated artists are clipped to the (shared) axes patch,
+        # so only that region needs to be pushed to the screen.
+        self.canvas.blit(self.ax.bbox)
 
     @QtCore.pyqtSlot(str, bool)
     def toggle_visibility(self, key, visible):
         self.data_axes[key].set_visible(visible)
+        self.plot_dirty = True
 
     @QtCore.pyqtSlot(str, object, object)
     def set_ylim(self, key, ymin, ymax):
         self.ylims[key] = [ymin, ymax]
+        self.plot_dirty = True
 
     @QtCore.pyqtSlot(object)
     def set_time_limits(self, timestamp):
@@ -581,40 +1077,87 @@ class TimeSeriesPlotter(QtCore.QObject):
         # If the lineedit is used to set time window, clear values from mouse
         self.right_click_t0 = None
         self.right_click_t1 = None
+        self.plot_dirty = True
 
     @QtCore.pyqtSlot(str, float, float)
     def update_data(self, key, tt, val):
-        if self.data[key] is None:
-            self.data[key] = np.array([[tt, val]])
-        else:
-            self.data[key] = np.append(self.data[key], np.array([[tt, val]]), axis=0)
+        # Just queue the sample; maybe_refresh appends a whole batch at once
+        # and only then updates the plot.
+        self.pending_samples[key].append((tt, val))
+        self.plot_dirty = True
+
+    def flush_pending_samples(self):
+        for key, queue in self.pending_samples.items():
+            if len(queue) == 0:
+                continue
+            samples = queue.drain(key)
+            rows = np.array(samples)
+            self.data[key].extend(rows)
+
+    def update_plot(self, key):
+        # The main window's decimation drops any sample that isn't newer than
+        # the previous one, so times are strictly increasing. That lets us
+        # find the plotted range by slicing rather than scanning the history.
+        data = self.data[key].data
+        if len(data) == 0:
+            return
 
         if self.right_click_t0 is not None and self.right_click_t1 is not None:
             t0 = self.right_click_t0
             t1 = self.right_click_t1
         else:
             if self.time_limit is None:
-                t0 = np.min(self.data[key][:, 0])
+                t0 = data[0, 0]
             elif self.time_limit < 0:
-                t0 = np.max(self.data[key][:, 0]) + self.time_limit
+                t0 = data[-1, 0] + self.time_limit
             else:
                 t0 = self.time_limit
-            t1 = np.max(self.data[key][:, 0])
+            t1 = data[-1, 0]
 
-        (gt_idxs,) = np.where(self.data[key][:, 0] >= t0)
-        (lt_idxs,) = np.where(self.data[key][:, 0] <= t1)
-        idxs = np.intersect1d(gt_idxs, lt_idxs)
+        i0 = np.searchsorted(data[:, 0], t0, side="left")
+        i1 = np.searchsorted(data[:, 0], t1, side="right")
+        visible = data[i0:i1]
 
-        self.data_plots[key].set_data(self.data[key][idxs, 0], self.data[key][idxs, 1])
+        self.data_plots[key].set_data(visible[:, 0], visible[:, 1])
 
         # Intentionally do NOT set xlim here -- that needs to be set only once,
         # on self.ax, or different-length time histories will fight.
 
         # Calculate axis limits based on _visible_ data points, not full history.
         ymin, ymax = self.ylims[key]
-        if ymin is None and len(idxs > 0):
-            ymin = np.min(self.data[key][idxs, 1])
-        if ymax is None and len(idxs > 0):
-            ymax = np.max(self.data[key][idxs, 1])
+        if len(visible) > 0 and (ymin is None or ymax is None):
+            vmin, vmax = self.visible_extrema(key, data[:, 1], i0, i1)
+            if ymin is None:
+                ymin = vmin
+            if ymax is None:
+                ymax = vmax
 
         self.data_axes[key].set_ylim([ymin, ymax])
+
+    def visible_extrema(self, key, values, i0, i1):
+        """
+        Return min/max of values[i0:i1], reusing the result from the previous
+        call for this key when the window has only moved forward.
+
+        Rescans the window only if a value that just left it was one of
+        the cached extrema (or the window jumped, e.g. a new mouse selection).
+        """
+        cached = self.window_extrema.get(key)
+        vmin = vmax = None
+        if cached is not None:
+            c_i0, c_i1, c_vmin, c_vmax = cached
+            if c_i0 <= i0 <= c_i1 <= i1:
+                dropped = values[c_i0:i0]
+                if len(dropped) == 0 or (
+                    np.min(dropped) > c_vmin and np.max(dropped) < c_vmax
+                ):
+                    vmin, vmax = c_vmin, c_vmax
+                    added = values[c_i1:i1]
+                    if len(added) > 0:
+                        vmin = min(vmin, np.min(added))
+                        vmax = max(vmax, np.max(added))
+        if vmin is None:
+            vmin = np.min(values[i0:i1])
+            vmax = np.max(values[i0:i1])
+        self.window_extrema[key] = (i0, i1, vmin, vmax)
+        return vmin, vmax
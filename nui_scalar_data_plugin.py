@@ -0,0 +1,126 @@
+import logging
+import os
+
+import PyQt5.QtWidgets as QtWidgets
+import PyQt5.QtGui as QtGui
+import PyQt5.QtCore as QtCore
+
+# This module is imported by QGIS at startup, so it should stay lightweight.
+# The heavy lifting (and heavy imports) live in nui_scalar_data.py, which is
+# only imported once the user opens the plugin.
+
+# Every module logs to a child of the package's logger. Messages go to stderr,
+# so they're visible when running qgis from the command line; set
+# NUI_SCALAR_DATA_LOG_LEVEL=DEBUG in the environment for developer diagnostics.
+log = logging.getLogger(__package__)
+if not log.handlers:
+    log.addHandler(logging.StreamHandler())
+log_level_name = os.environ.get("NUI_SCALAR_DATA_LOG_LEVEL", "INFO").upper()
+# getLevelName maps known names to their numeric level, and anything else
+# to a string; don't let a typo keep the plugin from loading.
+log_level = logging.getLevelName(log_level_name)
+if isinstance(log_level, int):
+    log.setLevel(log_level)
+else:
+    log.setLevel(logging.INFO)
+    log.warning(f"Unknown NUI_SCALAR_DATA_LOG_LEVEL '{log_level_name}'; using INFO")
+
+cmd_folder = os.path.dirname(os.path.abspath(__file__))
+icon_path = os.path.join(cmd_folder, "nui.png")
+
+
+# Needs to be a QObject to use signals/slots
+class NuiScalarDataPlugin(QtCore.QObject):
+    # Shared across plugin reloads (initGui/unload), so the PNG is only
+    # decoded once per QGIS session.
+    icon = None
+
+    def __init__(self, iface):
+        super(NuiScalarDataPlugin, self).__init__()
+        self.iface = iface
+        # Only one window at a time; re-running the plugin just raises it.
+        self.dw = None
+        self.mw = None
+
+    def initGui(self):
+        """
+        Required method; called when plugin loaded.
+        """
+        log.debug("initGui")
+        # Keep this to the bare minimum: it runs on QGIS's startup path.
+        # Everything else waits until the user actually opens the window.
+        if NuiScalarDataPlugin.icon is None:
+            NuiScalarDataPlugin.icon = QtGui.QIcon(icon_path)
+        self.action = QtWidgets.QAction(
+            NuiScalarDataPlugin.icon,
+            "Display scalar data from NUI",
+            self.iface.mainWindow(),
+        )
+        self.action.triggered.connect(self.run)
+        self.iface.addPluginToMenu("&NUI Scalar Data", self.action)
+        self.iface.addToolBarIcon(self.action)
+
+    def unload(self):
+        """
+        Required method; called when plugin unloaded.
+        """
+        log.debug("unload")
+        if self.dw is not None:
+            self.dw.close()
+        self.iface.removeToolBarIcon(self.action)
+        self.iface.removePluginMenu("&NUI Scalar Data", self.action)
+        del self.action
+
+    def run(self):
+        log.debug("run")
+        if self.dw is not None:
+            # Already running; don't start a second set of LCM subscriptions.
+            self.dw.show()
+            self.dw.raise_()
+            return
+
+        # I actually prefer this, because multiple windows are easier to deal
+        # with than a dockable window that won't go to the background.
+        # self.mainwindow = NuiScalarDataMainWindow(self.iface)
+        # self.mainwindow.show()
+        # self.mainwindow.run()
+
+        # However, it's possible to wrap the MainWindow in a DockWidget...
+        # Show the (empty) dock immediately and construct the MainWindow on
+        # the next pass through the event loop, so QGIS can paint first.
+        # Construction can't move to a QgsTask/QThread: everything it does
+        # (layer tree, matplotlib canvas, QgsProject entries) must happen
+        # on the GUI thread.
+        self.dw = QtWidgets.QDockWidget("NUI Scalar Data")
+        # Need to unsubscribe from LCM callbacks when the dock widget is closed.
+        self.dw.closeEvent = self.on_dock_closed
+        self.dw.setWidget(QtWidgets.QLabel("Loading NUI Scalar Data..."))
+        self.iface.addDockWidget(QtCore.Qt.BottomDockWidgetArea, self.dw)
+        QtCore.QTimer.singleShot(0, self.setup_main_window)
+
+        log.debug("Done with dockwidget")
+        # This function MUST return, or QGIS will block
+
+    def setup_main_window(self):
+        if self.dw is None:
+            # Closed before we got a chance to finish setting up.
+            return
+        # Deferred import: this pulls in numpy, matplotlib, LCM and the
+        # message definitions, none of which are needed until now.
+        from .nui_scalar_data import NuiScalarDataMainWindow
+
+        self.mw = NuiScalarDataMainWindow(self.iface)
+        self.dw.setWidget(self.mw)
+        self.mw.run()
+
+    def on_dock_closed(self, event):
+        if self.mw is not None:
+            self.mw.closeEvent(event)
+        else:
+            event.accept()
+        # The MainWindow can't be restarted after closeEvent, so tear it down;
+        # the next run() will build a fresh one.
+        self.iface.removeDockWidget(self.dw)
+        self.dw.deleteLater()
+        self.dw = None
+        self.mw = None
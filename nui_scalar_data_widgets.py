@@ -1,5 +1,6 @@
 import datetime
 import importlib
+import logging
 import typing
 
 import PyQt5.QtCore as QtCore
@@ -7,6 +8,8 @@ import PyQt5.QtGui as QtGui
 import PyQt5.QtWidgets as QtWidgets
 from qgis.core import Qgis, QgsMessageLog
 
+log = logging.getLogger(__name__)
+
 
 # Line widgets from:
 # https://stackoverflow.com/questions/5671354/how-to-programmatically-make-a-horizontal-line-in-qt
@@ -95,17 +98,17 @@ class ConfigureTimeLimitsWidget(QtWidgets.QWidget):
                 delta = -1 * delta
             timestamp = delta
         except Exception as ex:
-            print(f"Could not convert {time_str} to float; trying datetime")
+            log.debug(f"Could not convert {time_str} to float; trying datetime")
 
         try:
             # Force times to be in UTC by appending +0 and reading in %z
             fmt = "%Y-%m-%d %H:%M:%S%z"
-            print(f"trying dt with format {fmt} and str {time_str}")
+            log.debug(f"trying dt with format {fmt} and str {time_str}")
             dt = datetime.datetime.strptime(time_str + "+00:00", fmt)
-            print(f"Setting t0 = {dt.timestamp()}")
+            log.debug(f"Setting t0 = {dt.timestamp()}")
             timestamp = dt.timestamp()
         except Exception as ex:
-            print(f"Could not convert {time_str} to datetime; defaulting to None")
+            log.debug(f"Could not convert {time_str} to datetime; defaulting to None")
 
         # Default case; show full history
         self.time_limits_changed.emit(timestamp)
@@ -162,7 +165,6 @@ class ConfigureTimeSeriesWidget(QtWidgets.QWidget):
         self.grid.addWidget(self.clear_label, row, self.CLEAR_COLUMN)
 
         self.setLayout(self.grid)
-        self.remove_field.connect(self.remove_field_widgets)
 
     def add_field(self, key, layer_name):
         visible_checkbox = QtWidgets.QCheckBox()
@@ -182,7 +184,7 @@ class ConfigureTimeSeriesWidget(QtWidgets.QWidget):
         remove_button = QtWidgets.QPushButton("x")
         remove_button.setFixedWidth(25)
         remove_button.setStyleSheet("QPushButton {color: red;}")
-        remove_button.pressed.connect(lambda key=key: self.remove_field.emit(key))
+        remove_button.pressed.connect(lambda key=key: self.on_remove_pressed(key))
         clear_button = QtWidgets.QPushButton("-")
         clear_button.setFixedWidth(25)
         clear_button.pressed.connect(lambda key=key: self.clear_field.emit(key))
@@ -219,12 +221,17 @@ class ConfigureTimeSeriesWidget(QtWidgets.QWidget):
 
         self.ylim_changed.emit(key, ymin, ymax)
 
-    @QtCore.pyqtSlot(str)
+    def on_remove_pressed(self, key):
+        # Our own widgets are cleaned up with a direct call; the signal is
+        # for everybody else.
+        self.remove_field_widgets(key)
+        self.remove_field.emit(key)
+
     def remove_field_widgets(self, key):
-        print(f"ConfigureTimeSeriesWidget.remove_field_widgets: {key}")
+        log.debug(f"ConfigureTimeSeriesWidget.remove_field_widgets: {key}")
         if key not in self.widgets or self.widgets[key] is None:
             err = f"Cannot remove widgets for key {key} -- not in dict!"
-            print(err)
+            log.warning(err)
             return
 
         for widget in self.widgets[key]:
@@ -298,56 +305,60 @@ class AddScalarDataFieldWidget(QtWidgets.QWidget):
         self.setLayout(self.grid)
 
     def add_button_clicked(self, _checked):
-        print("add_button_clicked")
+        log.debug("add_button_clicked")
         channel_name = self.channel_name_lineedit.text()
         if channel_name.strip() == "":
             errmsg = "Please select non-empty channel name."
-            print(errmsg)
+            log.warning(errmsg)
             self.iface.messageBar().pushMessage(errmsg, level=Qgis.Warning)
             QgsMessageLog.logMessage(errmsg)
             return
-        print(f"channel_name: {channel_name}")
+        log.debug(f"channel_name: {channel_name}")
 
         msg_type_str = self.msg_type_lineedit.text()
         msg_type = None
-        msg = None
+        msg_fields = None
         try:
             msg_pkg, msg_class = msg_type_str.split(".")
             msg_module = importlib.import_module(msg_pkg)
             msg_type = getattr(msg_module, msg_class)
-            msg = msg_type()
-            if not hasattr(msg, "utime"):
+            # lcm-gen declares every field in __slots__, so there's no need
+            # to construct a message just to check them.
+            msg_fields = getattr(msg_type, "__slots__", None)
+            if msg_fields is None:
+                msg_fields = vars(msg_type())
+            if "utime" not in msg_fields:
                 errmsg = "Plotted messages must have utime field!"
-                print(errmsg)
+                log.warning(errmsg)
                 self.iface.messageBar().pushMessage(errmsg, level=Qgis.Warning)
                 QgsMessageLog.logMessage(errmsg)
                 return
         except Exception as ex:
-            errmsg = f"Tried to instantiate a '{msg_type_str}'. Got exception {ex}"
-            print(errmsg)
+            errmsg = f"Tried to load message type '{msg_type_str}'. Got exception {ex}"
+            log.warning(errmsg)
             self.iface.messageBar().pushMessage(errmsg, level=Qgis.Warning)
             QgsMessageLog.logMessage(errmsg)
             return
-        print(f"msg_type = {msg_type_str}")
+        log.debug(f"msg_type = {msg_type_str}")
 
         # QUESTION: Do we need to support nested fields?
         msg_field = self.msg_field_lineedit.text()
-        if not hasattr(msg, msg_field):
+        if msg_field not in msg_fields:
             errmsg = (
                 f"Message of type '{msg_type_str}' does not have field '{msg_field}'"
             )
-            print(errmsg)
+            log.warning(errmsg)
             self.iface.messageBar().pushMessage(errmsg, level=Qgis.Warning)
             QgsMessageLog.logMessage(errmsg)
             return
-        print(f"msg_field = {msg_field}")
+        log.debug(f"msg_field = {msg_field}")
 
         sample_rate_str = self.sample_rate_lineedit.text()
         try:
             sample_rate = float(sample_rate_str)
         except Exception as ex:
             errmsg = "Couldn't convert input '{sample_rate_str}' into float."
-            print(errmsg)
+            log.warning(errmsg)
             self.iface.messageBar().pushMessage(errmsg, level=Qgis.Warning)
             QgsMessageLog.logMessage(errmsg)
             return
@@ -355,11 +366,11 @@ class AddScalarDataFieldWidget(QtWidgets.QWidget):
         layer_name = self.layer_name_lineedit.text()
         if layer_name.strip() == "":
             errmsg = "Please select non-empty layer name."
-            print(errmsg)
+            log.warning(errmsg)
             self.iface.messageBar().pushMessage(errmsg, level=Qgis.Warning)
             QgsMessageLog.logMessage(errmsg)
             return
-        print(f"layer_name: {layer_name}")
+        log.debug(f"layer_name: {layer_name}")
 
         layer_enabled = self.enable_layer_checkbox.isChecked()
 